@@ -1,17 +1,13 @@
 import os
-from datetime import datetime
-from itertools import cycle
+import re
 from tkinter import (BOTH, END, Checkbutton, IntVar, Tk, W, filedialog,
                      messagebox)
 from tkinter.scrolledtext import ScrolledText
 from tkinter.ttk import Button, Entry, Frame, Label
-from typing import List, Tuple, Union
-
-from lxml import etree
-from lxml.etree import tostring
+from typing import List, Union
 
 from misc.excel import get_data_from_report
-from misc.utils import clean_patronymic, clean_phone
+from misc.pipeline import Context, load_pipeline
 
 help = """
 Программа предназначена для исправления данных в некорректно сформированном xml по ДН.
@@ -20,43 +16,16 @@ help = """
 
 Файл отчета xls формируется несколько некорректно. 
 Для исправления можно выполнить "Сохранить как" в формате excel 98/2003 и после этого выбирать для обработки.
-    
-"""
 
+Файл xml можно выбирать сразу в архиве (zip, gz, bz2, xz), распаковывать его не нужно.
 
-def check_duplicates(file_path: str) -> Tuple[str, int]:
-    """Возвращает сводку по наличию дубликатов в итоговой xml по параметрам fio, dr, ds."""
-    result = {}
+Порядок обработки записей задается в файле `pipeline.json`.
+"""
 
-    tree = etree.parse(file_path)
-    root = tree.getroot()
-    for zap in root.findall('ZAP'):
-        fio = f"{zap.find('FAM').text} {zap.find('IM').text} {zap.find('OT').text if zap.find('OT') is not None else ''}".strip()
-        dr = datetime.fromisoformat(zap.find('DR').text)
-        ds = zap.find('DS').text
-        result.setdefault((fio, dr, ds), []).append(ds)
+PACKAGE_NAME_PATTERN = re.compile(r'D-M\d+-F\d+-\d{4}-\d+')
+PIPELINE_CONFIG = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pipeline.json')
 
-    duplicates = [(x, y) for x, y in result.items() if len(y) > 1]
-    
-    return f'Дубликатов в xml: {len(duplicates)}', len(duplicates)
-
-def remove_duplicates(file_path: str) -> None:
-    """Удаляет дубликаты из конечного файла с результатом."""
-    result = {}
-
-    tree = etree.parse(file_path)
-    root = tree.getroot()
-    for zap in root.findall('ZAP'):
-        fio = f"{zap.find('FAM').text} {zap.find('IM').text} {zap.find('OT').text if zap.find('OT') is not None else ''}".strip()
-        dr = datetime.fromisoformat(zap.find('DR').text)
-        ds = zap.find('DS').text
-        if (fio, dr, ds) not in result:
-            result[(fio, dr, ds)] = [ds]
-        else:
-            root.remove(zap)
 
-    with open(file_path, "w", encoding='cp1251', errors=None, newline='\r\n') as f:
-        f.write(tostring(root, pretty_print=True, encoding='Windows-1251', xml_declaration=True).decode('cp1251'))
 
 class Application(Frame):
 
@@ -65,7 +34,6 @@ class Application(Frame):
         self.xml_filepath = None
         self.report_filepath = None
         self.console = None
-        self.ds_from_168n = None
         self.initUI()
 
     def initUI(self) -> None:
@@ -105,22 +73,30 @@ class Application(Frame):
         )
         self.cb2.grid(row=4, column=1, columnspan=2, sticky=W, ipadx=30)
 
+        # Признак для сжатия результата в zip
+        self.is_compress_result = IntVar(value=0)
+        self.cb3 = Checkbutton(
+            self, text="Сжать результат в zip",
+            variable=self.is_compress_result,
+        )
+        self.cb3.grid(row=5, column=1, columnspan=2, sticky=W, ipadx=30)
+
         # Имя файла
         package_number_field_label = Label(self, text="Имя файла")
-        package_number_field_label.grid(row=5, column=1, padx=5, pady=5)
+        package_number_field_label.grid(row=6, column=1, padx=5, pady=5)
         self.package_number_field = Entry(self, width=60)
-        self.package_number_field.grid(row=5, column=2)
+        self.package_number_field.grid(row=6, column=2)
         package_number_example_label = Label(self, text="D-M<Код МО>-F35-<Год>-<Номер пакета>, пример: D-M352530-F35-2023-1")
-        package_number_example_label.grid(row=6, column=1, columnspan=2)
+        package_number_example_label.grid(row=7, column=1, columnspan=2)
 
         run_button = Button(self, text="Преобразовать", command=self.rebuild_xml)
-        run_button.grid(row=7, column=2)
+        run_button.grid(row=8, column=2)
         help_button = Button(self, text="Справка", command=self.show_help)
-        help_button.grid(row=7, column=3)
+        help_button.grid(row=8, column=3)
 
         # Виджет для отображаения результатов обработки
         self.console = ScrolledText(self, height=10)
-        self.console.grid(row=8, column=1, columnspan=3)
+        self.console.grid(row=9, column=1, columnspan=3)
 
     def to_console(self, msgs: Union[str, List[str]]) -> None:
         """Добавляет строку в виджет вывода результатов на экран."""
@@ -160,105 +136,40 @@ class Application(Frame):
         if not self.xml_filepath:
             messagebox.showerror("Ошибка", "Не выбран xml файл.")
             return
-        
-        report_data = None
-        phone_data = None
-        xml_file_path = self.xml_filepath
 
+        custom_filename = self.package_number_field.get().strip()
+        if custom_filename and not PACKAGE_NAME_PATTERN.fullmatch(custom_filename.upper()):
+            messagebox.showerror(
+                "Ошибка", "Имя файла должно иметь вид D-M<Код МО>-F35-<Год>-<Номер пакета>, например D-M352530-F35-2023-1."
+            )
+            return
+        
         self.to_console('Обработка файла отчета...')
         report_data, phone_data = get_data_from_report(str(self.report_filepath))
         self.to_console('Завершено.')
 
-        # фиксируем позицию элементов
-        prepared_report_data = {}
-        for x, y in report_data.items():
-            data = list(y)
-            data.sort()
-            prepared_report_data[x] = cycle(data)
+        pipeline = load_pipeline(PIPELINE_CONFIG)
 
-        self.to_console('Обработка xml файла...')
-        tree = etree.parse(xml_file_path)
-        root = tree.getroot()
-        for zap in root.findall('ZAP'):
-            if zap.find('DISP_TYP').text != '3':
-                if self.is_allow_remove():
-                    zap.getparent().remove(zap)
-            else:
-                fio = f"{zap.find('FAM').text} {zap.find('IM').text} {clean_patronymic(zap.find('OT'))}".strip()
-                dr = datetime.fromisoformat(zap.find('DR').text)
-                dr_str = dr.strftime('%Y-%m-%d')
-                prev = datetime.fromisoformat(zap.find('DAT_PREV').text).date() if zap.find('DAT_PREV').text else None
-
-                if not zap.find('DS').text:
-                    rd = prepared_report_data.get((fio, dr), None)
-                    if rd:
-                        date_prev, ds = next(rd)
-                        zap.find('DS').text = ds
-                        zap.find('DAT_PREV').text = date_prev.strftime('%Y-%m-%d')
-                        phones = [x for x in phone_data.get((fio, dr), []) if x != '']
-                        # Если телефон указан в отчете
-                        if phones:
-                            zap.find('PHONE').text = clean_phone(phones[0])
-                    else:
-                        self.to_console(f'Для {fio} {dr_str} не найдено данных в отчете')
-
-        if self.filtered_by_ds_from168n.get():
-            self.to_console(f'Фильтруем записи по приказу 168 Н...')
-
-            if self.ds_from_168n is None:
-                from decr_168n_15_03_2022 import get_all_diagnoses
-                self.ds_from_168n = get_all_diagnoses()
-
-            removing_counter = 0
-            records = root.findall('ZAP')
-            for zap in records:
-                if zap.find('DISP_TYP').text == '3':
-                    if str(zap.find('DS').text).strip().upper() not in self.ds_from_168n:
-                        zap.getparent().remove(zap)
-                        removing_counter += 1
-
-            self.to_console(f'Фильтрация завершена. Удалено {removing_counter} записей из {len(records)}')
-        
-        custom_filename = self.package_number_field.get()
+        extension = 'zip' if self.is_compress_result.get() else 'xml'
         if custom_filename:
-            custom_filename = custom_filename.upper()
-            
-            # D-M352530-F35-2023-1
-            filename_elements = custom_filename.split('-')
-
-            result_path = os.path.join(os.getcwd(), f'{custom_filename}.xml')
-            root.find('ZGLV').find('FILENAME').text = custom_filename
-            
-            build_date = datetime.now()
-            root.find('ZGLV').find('DATA').text = build_date.strftime('%Y-%m-%d')
-
-            root.find('ZGLV').find('CODE_MO').text = filename_elements[1][1:]
-
-            root.find('ZGLV').find('YEAR').text = filename_elements[3]
-            root.find('ZGLV').find('R').text = filename_elements[4]
+            result_path = os.path.join(os.getcwd(), f'{custom_filename.upper()}.{extension}')
         else:
-            result_path = os.path.join(os.getcwd(), 'result.xml')
-        
-        with open(result_path, "w", encoding='cp1251', errors=None, newline='\r\n') as f:
-            f.write(tostring(root, pretty_print=True, encoding='Windows-1251', xml_declaration=True).decode('cp1251'))
-        
-        self.to_console(['Завершено.', '', 'Поиск дубликатов в xml...'])
-        result_text, count = check_duplicates(result_path)
-        if count > 0:
-            self.to_console(result_text)
-            remove_duplicates(result_path)
-            self.to_console('Дубликаты удалены.\n')
-
-        self.to_console('Поиск записей без диагноза:')
-        i = 0
-        for zap in root.findall('ZAP'):
-            if zap.find('DISP_TYP').text != '3' and not zap.find('DS').text:
-                zap.getparent().remove(zap)
-                i += 1
-        if i:
-            self.to_console(f'Найдено и удалено {i} записей.')
-        else:
-            self.to_console(f'Записей не найдено.\n')
+            result_path = os.path.join(os.getcwd(), f'result.{extension}')
+
+        ctx = Context(
+            options={
+                'remove_other_data': self.is_allow_remove(),
+                'filter_168n': bool(self.filtered_by_ds_from168n.get()),
+                'package_name': custom_filename,
+            },
+            report_data=report_data,
+            phone_data=phone_data,
+            log=self.to_console,
+        )
+
+        self.to_console('Обработка xml файла...')
+        total, written = pipeline.run(self.xml_filepath, result_path, ctx)
+        self.to_console(f'Завершено. Записей в xml: {written} из {total}')
 
         self.to_console(f'Результат находится в `{result_path}`')
         self.to_console(['', 'Готово.'])
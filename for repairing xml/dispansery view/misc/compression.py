@@ -0,0 +1,90 @@
+"""
+Чтение и запись xml в сжатом виде.
+
+Формат входного файла определяется по сигнатуре (gzip, bz2, xz, zip), поэтому
+архив можно выбирать напрямую, без распаковки на диск. Из zip читается первый xml файл архива.
+Чтение продублировано в scripts/xml_to_ods/xml_to_ods.py (open_xml), при изменении нужно править обе копии.
+Формат выходного файла определяется по расширению (.gz, .bz2, .xz, .zip),
+результат записывается через временный файл.
+"""
+import bz2
+import gzip
+import lzma
+import os
+import time
+import zipfile
+from contextlib import ExitStack, contextmanager
+from typing import BinaryIO, Iterator
+
+SIGNATURES = (
+    (b'\x1f\x8b', gzip.open),
+    (b'BZh', bz2.open),
+    (b'\xfd7zXZ\x00', lzma.open),
+)
+COMPRESSORS = {
+    '.gz': gzip.open,
+    '.bz2': bz2.open,
+    '.xz': lzma.open,
+}
+
+
+def get_zip_member(archive: zipfile.ZipFile) -> str:
+    """Возвращает имя первого xml файла в архиве."""
+    for name in archive.namelist():
+        if name.lower().endswith('.xml'):
+            return name
+    raise ValueError(f'В архиве {archive.filename} нет xml файла')
+
+
+@contextmanager
+def open_input(file_path: str) -> Iterator[BinaryIO]:
+    """Открывает файл на чтение, распаковывая его на лету."""
+    with ExitStack() as stack:
+        f = stack.enter_context(open(file_path, 'rb'))
+        head = f.read(8)
+        f.seek(0)
+
+        if head.startswith(b'PK\x03\x04'):
+            archive = stack.enter_context(zipfile.ZipFile(f))
+            yield stack.enter_context(archive.open(get_zip_member(archive)))
+            return
+
+        for signature, opener in SIGNATURES:
+            if head.startswith(signature):
+                yield stack.enter_context(opener(f, 'rb'))
+                return
+        yield f
+
+
+@contextmanager
+def open_output(file_path: str) -> Iterator[BinaryIO]:
+    """
+    Открывает файл на запись, сжимая его, если это следует из расширения.
+
+    Данные пишутся во временный файл рядом с file_path, который заменяет file_path
+    только при успешном завершении записи. При ошибке прежний результат остается на месте.
+    """
+    name, ext = os.path.splitext(file_path)
+    ext = ext.lower()
+    tmp_path = f'{file_path}.{os.getpid()}.tmp'
+
+    try:
+        with ExitStack() as stack:
+            f = stack.enter_context(open(tmp_path, 'wb'))
+            if ext == '.zip':
+                archive = stack.enter_context(zipfile.ZipFile(f, 'w', zipfile.ZIP_DEFLATED))
+                # без явной даты запись в архиве получает дату 1980-01-01
+                info = zipfile.ZipInfo(f'{os.path.basename(name)}.xml', date_time=time.localtime()[:6])
+                info.compress_type = zipfile.ZIP_DEFLATED
+                yield stack.enter_context(archive.open(info, 'w'))
+            elif ext in COMPRESSORS:
+                yield stack.enter_context(COMPRESSORS[ext](f, 'wb'))
+            else:
+                yield f
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,123 @@
+"""
+Реестр перечней диагнозов из приказов МЗ.
+
+Перечни хранятся в файлах json в каталоге `orders` (один файл на редакцию приказа)
+с указанием срока действия и разбивкой по приложениям / специальностям врачей.
+Файлы компилируются в множества кодов один раз за время работы программы (см. `get_registry`).
+"""
+import json
+import os
+from datetime import date
+from typing import Dict, FrozenSet, Iterable, List, Optional
+
+ORDERS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'orders')
+
+
+class DiagnosisList:
+    """Перечень диагнозов одного приложения приказа."""
+
+    def __init__(
+        self,
+        order: str,
+        appendix: str,
+        specialty: str,
+        valid_from: date,
+        valid_to: Optional[date],
+        diagnoses: FrozenSet[str],
+    ) -> None:
+        self.order = order
+        self.appendix = appendix
+        self.specialty = specialty
+        self.valid_from = valid_from
+        self.valid_to = valid_to
+        self.diagnoses = diagnoses
+
+    def is_valid(self, on_date: date) -> bool:
+        """Возвращает признак действия перечня на дату (дата окончания не включается)."""
+        if on_date < self.valid_from:
+            return False
+        return self.valid_to is None or on_date < self.valid_to
+
+    def __repr__(self) -> str:
+        return f'<DiagnosisList {self.order} прил. {self.appendix} ({self.specialty}) {self.valid_from}-{self.valid_to}>'
+
+
+def compile_order(file_path: str) -> List[DiagnosisList]:
+    """Читает файл приказа и возвращает перечни диагнозов по приложениям."""
+    with open(file_path, encoding='utf-8') as f:
+        data = json.load(f)
+
+    valid_from = date.fromisoformat(data['valid_from'])
+    valid_to = date.fromisoformat(data['valid_to']) if data.get('valid_to') else None
+
+    result = []
+    for appendix in data['appendices']:
+        diagnoses = set()
+        for codes in appendix['groups'].values():
+            diagnoses.update(code.strip().upper() for code in codes)
+        result.append(
+            DiagnosisList(
+                order=data['order'],
+                appendix=str(appendix['appendix']),
+                specialty=appendix['specialty'],
+                valid_from=valid_from,
+                valid_to=valid_to,
+                diagnoses=frozenset(diagnoses),
+            )
+        )
+    return result
+
+
+def merge_diagnoses(lists: Iterable[DiagnosisList]) -> FrozenSet[str]:
+    """Возвращает объединенное множество диагнозов перечней."""
+    return frozenset().union(*(x.diagnoses for x in lists))
+
+
+class DiagnosisRegistry:
+    """Реестр перечней диагнозов всех приказов из каталога."""
+
+    def __init__(self, orders_dir: str = ORDERS_DIR) -> None:
+        self.orders_dir = orders_dir
+        self._lists = None
+
+    @property
+    def lists(self) -> List[DiagnosisList]:
+        """Возвращает все перечни, загружая их при первом обращении."""
+        if self._lists is None:
+            self._lists = []
+            for filename in sorted(os.listdir(self.orders_dir)):
+                if filename.lower().endswith('.json'):
+                    self._lists.extend(compile_order(os.path.join(self.orders_dir, filename)))
+        return self._lists
+
+    def select(
+        self,
+        on_date: date,
+        order: Optional[str] = None,
+        specialties: Optional[Iterable[str]] = None,
+        appendices: Optional[Iterable[str]] = None,
+    ) -> List[DiagnosisList]:
+        """Возвращает перечни, действующие на дату, с отбором по приказу, специальностям и приложениям."""
+        specialties = set(specialties) if specialties else None
+        appendices = {str(x) for x in appendices} if appendices else None
+        return [
+            x for x in self.lists
+            if x.is_valid(on_date)
+            and (order is None or x.order == order)
+            and (specialties is None or x.specialty in specialties)
+            and (appendices is None or x.appendix in appendices)
+        ]
+
+    def get_diagnoses(self, on_date: date, **kwargs) -> FrozenSet[str]:
+        """Возвращает объединенное множество диагнозов перечней, отобранных `select`."""
+        return merge_diagnoses(self.select(on_date, **kwargs))
+
+
+_registries: Dict[str, DiagnosisRegistry] = {}
+
+
+def get_registry(orders_dir: str = ORDERS_DIR) -> DiagnosisRegistry:
+    """Возвращает реестр для каталога, создавая его один раз за время работы программы."""
+    if orders_dir not in _registries:
+        _registries[orders_dir] = DiagnosisRegistry(orders_dir)
+    return _registries[orders_dir]
@@ -0,0 +1,439 @@
+"""
+Конвейер обработки xml по ДН.
+
+Конвейер собирается из этапов, описанных в конфигурационном файле (json).
+Все этапы применяются к каждой записи `ZAP` за один потоковый проход по файлу,
+поэтому новое региональное правило добавляется отдельным этапом,
+а не очередным циклом по `findall('ZAP')`.
+"""
+import json
+from datetime import date, datetime
+from itertools import cycle
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from lxml import etree
+from lxml.etree import Element
+
+from misc.compression import open_input, open_output
+from misc.diagnoses import ORDERS_DIR, get_registry, merge_diagnoses
+from misc.utils import clean_patronymic, clean_phone
+
+
+class Context:
+    """Общие данные, доступные всем этапам конвейера."""
+
+    def __init__(
+        self,
+        options: Optional[Dict[str, Any]] = None,
+        report_data: Optional[dict] = None,
+        phone_data: Optional[dict] = None,
+        log: Optional[Callable[[str], None]] = None,
+    ) -> None:
+        self.options = options or {}
+        self.report_data = report_data or {}
+        self.phone_data = phone_data or {}
+        self.log = log or print
+        # дата пакета из исходного `ZGLV/DATA`, заполняется перед запуском этапов
+        self.package_date: Optional[date] = None
+
+
+def get_text(zap: Element, field: str) -> str:
+    """Возвращает текст поля записи или пустую строку."""
+    obj = zap.find(field)
+    if obj is None or obj.text is None:
+        return ''
+    return obj.text.strip()
+
+
+class Stage:
+    """
+    Базовый этап конвейера.
+
+    option - имя опции, при ложном значении которой этап отключается;
+    when / unless - условия вида {поле: [значения]}, ограничивающие записи, к которым применяется этап.
+    """
+
+    def __init__(
+        self,
+        option: Optional[str] = None,
+        when: Optional[Dict[str, List[str]]] = None,
+        unless: Optional[Dict[str, List[str]]] = None,
+    ) -> None:
+        self.option = option
+        self.when = when or {}
+        self.unless = unless or {}
+
+    def is_enabled(self, ctx: Context) -> bool:
+        """Возвращает признак включения этапа."""
+        return self.option is None or bool(ctx.options.get(self.option))
+
+    def is_applicable(self, zap: Element) -> bool:
+        """Проверяет условия when / unless для записи."""
+        for field, values in self.when.items():
+            if get_text(zap, field) not in values:
+                return False
+        for field, values in self.unless.items():
+            if get_text(zap, field) in values:
+                return False
+        return True
+
+    def start(self, header: Element, ctx: Context) -> None:
+        """Вызывается один раз после чтения `ZGLV`, сбрасывает состояние предыдущего прохода."""
+
+    def process(self, zap: Element, ctx: Context) -> bool:
+        """Обрабатывает запись, возвращает False, если запись нужно удалить."""
+        return True
+
+    def finish(self, ctx: Context) -> None:
+        """Вызывается после обработки всех записей."""
+
+
+class FilterStage(Stage):
+    """Оставляет только записи, у которых значение поля входит в список."""
+
+    def __init__(self, field: str, keep: List[str], **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.field = field
+        self.keep = set(keep)
+        self.removed = 0
+
+    def start(self, header: Element, ctx: Context) -> None:
+        self.removed = 0
+
+    def process(self, zap: Element, ctx: Context) -> bool:
+        if get_text(zap, self.field) in self.keep:
+            return True
+        self.removed += 1
+        return False
+
+    def finish(self, ctx: Context) -> None:
+        if self.removed:
+            ctx.log(f'Удалено записей с {self.field} не из {sorted(self.keep)}: {self.removed}')
+
+
+class DiagnosesFilterStage(Stage):
+    """
+    Оставляет только записи с диагнозами из перечней приказа.
+
+    Перечни берутся из реестра по дате пакета (`ZGLV/DATA` исходного файла, см. `Context.package_date`),
+    при необходимости с отбором по специальностям и приложениям.
+    """
+
+    def __init__(
+        self,
+        order: Optional[str] = None,
+        specialties: Optional[List[str]] = None,
+        appendices: Optional[List[str]] = None,
+        field: str = 'DS',
+        orders_dir: str = ORDERS_DIR,
+        **kwargs,
+    ) -> None:
+        super().__init__(**kwargs)
+        self.order = order
+        self.specialties = specialties
+        self.appendices = appendices
+        self.field = field
+        self.orders_dir = orders_dir
+        self.diagnoses = None
+        self.checked = 0
+        self.removed = 0
+
+    def start(self, header: Element, ctx: Context) -> None:
+        self.diagnoses = None
+        self.checked = 0
+        self.removed = 0
+
+        on_date = ctx.package_date
+        if on_date is None:
+            on_date = date.today()
+            ctx.log(f'Дата пакета не определена, перечни диагнозов выбираются на {on_date:%d.%m.%Y}.')
+
+        lists = get_registry(self.orders_dir).select(
+            on_date, order=self.order, specialties=self.specialties, appendices=self.appendices,
+        )
+        if not lists:
+            ctx.log(f'Не найдено действующих на {on_date:%d.%m.%Y} перечней диагнозов, фильтрация не выполняется.')
+            return
+
+        self.diagnoses = merge_diagnoses(lists)
+        orders = ', '.join(sorted({f'{x.order} прил. {x.appendix}' for x in lists}))
+        ctx.log(f'Фильтруем записи по приказу ({orders}) на {on_date:%d.%m.%Y}...')
+
+    def process(self, zap: Element, ctx: Context) -> bool:
+        if self.diagnoses is None:
+            return True
+        self.checked += 1
+        if get_text(zap, self.field).upper() in self.diagnoses:
+            return True
+        self.removed += 1
+        return False
+
+    def finish(self, ctx: Context) -> None:
+        if self.diagnoses is not None:
+            ctx.log(f'Фильтрация завершена. Удалено {self.removed} записей из {self.checked}')
+
+
+class ReportEnrichStage(Stage):
+    """Подставляет диагноз, дату последней явки и телефон из отчета."""
+
+    def start(self, header: Element, ctx: Context) -> None:
+        # фиксируем позицию элементов
+        self.prepared_report_data = {}
+        for x, y in ctx.report_data.items():
+            data = list(y)
+            data.sort()
+            self.prepared_report_data[x] = cycle(data)
+
+    def process(self, zap: Element, ctx: Context) -> bool:
+        if get_text(zap, 'DS'):
+            return True
+
+        fio = f"{zap.find('FAM').text} {zap.find('IM').text} {clean_patronymic(zap.find('OT'))}".strip()
+        dr = datetime.fromisoformat(zap.find('DR').text)
+        rd = self.prepared_report_data.get((fio, dr), None)
+        if rd:
+            date_prev, ds = next(rd)
+            zap.find('DS').text = ds
+            zap.find('DAT_PREV').text = date_prev.strftime('%Y-%m-%d')
+            phones = [x for x in ctx.phone_data.get((fio, dr), []) if x != '']
+            # Если телефон указан в отчете
+            if phones:
+                zap.find('PHONE').text = clean_phone(phones[0])
+        else:
+            ctx.log(f"Для {fio} {dr.strftime('%Y-%m-%d')} не найдено данных в отчете")
+        return True
+
+
+class ValidateStage(Stage):
+    """Удаляет записи, в которых не заполнено хотя бы одно из обязательных полей."""
+
+    def __init__(self, required: List[str], **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.required = required
+        self.removed = 0
+
+    def start(self, header: Element, ctx: Context) -> None:
+        self.removed = 0
+
+    def process(self, zap: Element, ctx: Context) -> bool:
+        if all(get_text(zap, field) for field in self.required):
+            return True
+        self.removed += 1
+        return False
+
+    def finish(self, ctx: Context) -> None:
+        if self.removed:
+            ctx.log(f"Найдено и удалено {self.removed} записей без {', '.join(self.required)}.")
+
+
+class DedupStage(Stage):
+    """Удаляет повторные записи с совпадающими ключевыми полями."""
+
+    def __init__(self, keys: List[str], **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.keys = keys
+        self.seen = set()
+        self.removed = 0
+
+    def start(self, header: Element, ctx: Context) -> None:
+        self.seen = set()
+        self.removed = 0
+
+    def process(self, zap: Element, ctx: Context) -> bool:
+        key = tuple(get_text(zap, field) for field in self.keys)
+        if key not in self.seen:
+            self.seen.add(key)
+            return True
+        self.removed += 1
+        return False
+
+    def finish(self, ctx: Context) -> None:
+        if self.removed:
+            ctx.log(f'Дубликатов удалено: {self.removed}')
+
+
+class SetFieldStage(Stage):
+    """
+    Устанавливает значение поля записи.
+
+    only_empty - менять значение только в записях, где поле не заполнено.
+    Отсутствующее поле добавляется в конец записи.
+    """
+
+    def __init__(self, field: str, value: str, only_empty: bool = False, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.field = field
+        self.value = value
+        self.only_empty = only_empty
+        self.changed = 0
+
+    def start(self, header: Element, ctx: Context) -> None:
+        self.changed = 0
+
+    def process(self, zap: Element, ctx: Context) -> bool:
+        obj = zap.find(self.field)
+        if obj is None:
+            obj = etree.SubElement(zap, self.field)
+        elif self.only_empty and get_text(zap, self.field):
+            return True
+
+        if obj.text != self.value:
+            obj.text = self.value
+            self.changed += 1
+        return True
+
+    def finish(self, ctx: Context) -> None:
+        if self.changed:
+            ctx.log(f'Изменено значение {self.field} в {self.changed} записях.')
+
+
+class PackageHeaderStage(Stage):
+    """Переписывает `ZGLV` по имени пакета из опции (D-M<Код МО>-F35-<Год>-<Номер пакета>)."""
+
+    def __init__(self, option: str = 'package_name', **kwargs) -> None:
+        super().__init__(option=option, **kwargs)
+
+    def start(self, header: Element, ctx: Context) -> None:
+        custom_filename = str(ctx.options[self.option]).upper()
+
+        # D-M352530-F35-2023-1
+        filename_elements = custom_filename.split('-')
+
+        header.find('FILENAME').text = custom_filename
+        header.find('DATA').text = datetime.now().strftime('%Y-%m-%d')
+        header.find('CODE_MO').text = filename_elements[1][1:]
+        header.find('YEAR').text = filename_elements[3]
+        header.find('R').text = filename_elements[4]
+
+
+STAGES = {
+    'filter': FilterStage,
+    'filter_ds': DiagnosesFilterStage,
+    'enrich_report': ReportEnrichStage,
+    'validate': ValidateStage,
+    'dedup': DedupStage,
+    'set': SetFieldStage,
+    'package_header': PackageHeaderStage,
+}
+
+
+class _CRLFWriter:
+    """Обертка над бинарным файлом, заменяющая переводы строк на `\\r\\n`."""
+
+    def __init__(self, f) -> None:
+        self._f = f
+
+    def write(self, data: bytes) -> int:
+        return self._f.write(data.replace(b'\n', b'\r\n'))
+
+
+class Pipeline:
+    """Последовательность этапов, применяемая к xml за один проход."""
+
+    def __init__(self, stages: Iterable[Stage]) -> None:
+        self.stages = list(stages)
+
+    @classmethod
+    def from_config(cls, config: List[dict]) -> 'Pipeline':
+        """Собирает конвейер из списка описаний этапов вида {"type": ..., <параметры>}."""
+        stages = []
+        for item in config:
+            params = dict(item)
+            stage_type = params.pop('type')
+            if stage_type not in STAGES:
+                raise ValueError(f'Неизвестный тип этапа: {stage_type}')
+            stages.append(STAGES[stage_type](**params))
+        return cls(stages)
+
+    def run(self, source, result_path: str, ctx: Context) -> Tuple[int, int]:
+        """
+        Обрабатывает xml из source и записывает результат в result_path.
+
+        source может быть сжат (gzip, bz2, xz, zip), result_path сжимается по расширению.
+
+        Возвращает количество прочитанных и записанных записей.
+        """
+        stages = [stage for stage in self.stages if stage.is_enabled(ctx)]
+        ctx.package_date = None
+
+        with open_input(source) as src, open_output(result_path) as f:
+            total, written = self._run(src, f, stages, ctx)
+
+        for stage in stages:
+            stage.finish(ctx)
+
+        return total, written
+
+    @staticmethod
+    def _get_package_date(header: Element, ctx: Context) -> Optional[date]:
+        """Возвращает дату пакета из `ZGLV/DATA` или None, если она не указана или некорректна."""
+        package_date = get_text(header, 'DATA')
+        if not package_date:
+            return None
+        try:
+            return datetime.fromisoformat(package_date).date()
+        except ValueError:
+            ctx.log(f'Некорректная дата пакета в ZGLV/DATA: `{package_date}`.')
+            return None
+
+    def _run(self, src, f, stages: List[Stage], ctx: Context) -> Tuple[int, int]:
+        """Потоковый проход по записям src с записью результата в f."""
+        total = written = 0
+        started = False
+
+        context = etree.iterparse(src, events=('start', 'end'))
+        _, root = next(context)
+        writer = _CRLFWriter(f)
+        with etree.xmlfile(writer, encoding='Windows-1251') as xf:
+            xf.write_declaration()
+            with xf.element(root.tag, root.attrib):
+                text_written = False
+                for event, obj in context:
+                    if event != 'end' or obj.getparent() is not root:
+                        continue
+
+                    # текст корня до первого дочернего элемента известен только после его разбора
+                    if not text_written:
+                        xf.write(root.text or '')
+                        text_written = True
+
+                    keep = True
+                    if obj.tag == 'ZGLV' and not started:
+                        # читаем дату до этапов, которые могут переписать `ZGLV`
+                        ctx.package_date = self._get_package_date(obj, ctx)
+                        for stage in stages:
+                            stage.start(obj, ctx)
+                        started = True
+                    elif obj.tag == 'ZAP':
+                        if not started:
+                            for stage in stages:
+                                stage.start(etree.Element('ZGLV'), ctx)
+                            started = True
+                        total += 1
+                        for stage in stages:
+                            if stage.is_applicable(obj) and not stage.process(obj, ctx):
+                                keep = False
+                                break
+                        written += keep
+
+                    if keep:
+                        xf.write(obj)
+                    # освобождаем память от уже обработанных элементов
+                    obj.clear()
+                    while obj.getprevious() is not None:
+                        del root[0]
+        # как и tostring(pretty_print=True), завершаем файл переводом строки
+        writer.write(b'\n')
+
+        if not started:
+            for stage in stages:
+                stage.start(etree.Element('ZGLV'), ctx)
+
+        return total, written
+
+
+def load_pipeline(config_path: str) -> Pipeline:
+    """Загружает конвейер из конфигурационного файла json."""
+    with open(config_path, encoding='utf-8') as f:
+        config = json.load(f)
+    return Pipeline.from_config(config['stages'])
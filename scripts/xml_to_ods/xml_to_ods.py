@@ -1,44 +1,91 @@
+import bz2
+import gzip
+import lzma
 import os
+import zipfile
+from contextlib import ExitStack, contextmanager
 from datetime import datetime
 
 import odsgenerator
 from lxml import etree
-from progressbar import ProgressBar
+from progressbar import ProgressBar, UnknownLength
 
 #
 # Конвертер xml файла с прикрепленным населением в таблицу формата ods
 # Файл собирается не особенно шустро, где-то примерно 5000 строк / минуту
+# Файл xml может лежать в архиве (zip, gz, bz2, xz), он читается без распаковки на диск
 #
 
 HEADER = ['Фамилия', 'Имя', 'Отчество', 'Дата рождения', 'ЕНП']
 FIELDS = ['FAM', 'IM', 'OT', 'DR', 'NPOLIS']
 WIDTH_LIST = [2500, 2500, 2900, 2500, 3500]
+EXTENSIONS = ('.XML', '.XML.GZ', '.XML.BZ2', '.XML.XZ', '.ZIP')
+
+# SIGNATURES, get_zip_member и open_xml повторяют misc/compression.py (open_input)
+# из "for repairing xml/dispansery view": скрипт запускается отдельно и не зависит от той утилиты,
+# поэтому код скопирован намеренно, при изменении нужно править обе копии.
+SIGNATURES = (
+    (b'\x1f\x8b', gzip.open),
+    (b'BZh', bz2.open),
+    (b'\xfd7zXZ\x00', lzma.open),
+)
+
+
+def get_zip_member(archive):
+    """Возвращает имя первого xml файла в архиве."""
+    for name in archive.namelist():
+        if name.lower().endswith('.xml'):
+            return name
+    raise ValueError(f'В архиве {archive.filename} нет xml файла')
+
+
+@contextmanager
+def open_xml(file_path):
+    """Открывает xml на чтение, распаковывая его на лету. Из zip читается первый xml файл."""
+    with ExitStack() as stack:
+        f = stack.enter_context(open(file_path, 'rb'))
+        head = f.read(8)
+        f.seek(0)
+
+        if head.startswith(b'PK\x03\x04'):
+            archive = stack.enter_context(zipfile.ZipFile(f))
+            yield stack.enter_context(archive.open(get_zip_member(archive)))
+            return
+
+        for signature, opener in SIGNATURES:
+            if head.startswith(signature):
+                yield stack.enter_context(opener(f, 'rb'))
+                return
+        yield f
+
 
 output_filename = ''
 for filename in os.listdir(os.getcwd()):
-    if filename.upper().startswith('PRKS') and filename.upper().endswith('XML'):
-        tree = etree.parse(os.path.join(os.getcwd(), filename))
-        root = tree.getroot()
-        sheetdate = root.find('ZGLV').find('DATE').text
-        output_filename = f"Население на {datetime.fromisoformat(sheetdate).strftime('%d.%m.%Y')}"
-        
+    if filename.upper().startswith('PRKS') and filename.upper().endswith(EXTENSIONS):
         rows = []
+        bar = ProgressBar(max_value=UnknownLength)
 
-        persons = root.findall('PERS')
-        bar = ProgressBar(min_value=1, max_value=len(persons))
-        
         print('Обрабатываем данные')
-        for i, pers in enumerate(persons, start = 1):
-            rows.append(
-                {
-                    'row': ['' if pers.find(field) is None else pers.find(field).text for field in FIELDS],
-                    'style': 'grid_06pt'
-                }
-            )
-            bar.update(i)
-        
+        with open_xml(os.path.join(os.getcwd(), filename)) as f:
+            for _, obj in etree.iterparse(f, tag=('ZGLV', 'PERS')):
+                if obj.tag == 'ZGLV':
+                    sheetdate = obj.find('DATE').text
+                    output_filename = f"Население на {datetime.fromisoformat(sheetdate).strftime('%d.%m.%Y')}"
+                else:
+                    rows.append(
+                        {
+                            'row': ['' if obj.find(field) is None else obj.find(field).text for field in FIELDS],
+                            'style': 'grid_06pt'
+                        }
+                    )
+                    bar.update(len(rows))
+                # освобождаем память от уже обработанных элементов
+                obj.clear()
+                while obj.getprevious() is not None:
+                    del obj.getparent()[0]
+
         bar.finish()
-        
+
         print('Ожидаем сборки файла...')
         raw = odsgenerator.ods_bytes(
             [